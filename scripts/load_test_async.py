@@ -0,0 +1,113 @@
+"""
+Load test: sync API (src.api.main) vs async API (src.api.async_main).
+
+Starts each app under uvicorn, then sweeps the number of concurrent clients
+across and beyond Starlette's default threadpool size (40) and prints the
+throughput and latency per level. The async app is run once per --pool-size
+(TARIF_DB_POOL_SIZE). Run it on the target host: with one core, both apps are
+CPU-bound and neither scales with the number of clients.
+
+Usage:
+    python scripts/load_test_async.py
+    python scripts/load_test_async.py --pool-size 64 128 256
+    python scripts/load_test_async.py --path "/v1/cells?table_name=TV-L"
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+APPS = {"sync": "src.api.main:app", "async": "src.api.async_main:app"}
+CONCURRENCY = [10, 40, 80, 160, 320]
+
+
+async def wait_until_ready(url: str, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+async def run_level(url: str, concurrency: int, duration: float):
+    """Keep `concurrency` requests in flight for `duration` seconds."""
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", default="/v1/tables")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument(
+        "--pool-size", type=int, nargs="+", default=[64], help="async DB pool sizes"
+    )
+    args = parser.parse_args()
+
+    runs = [("sync", APPS["sync"], {})]
+    for size in args.pool_size:
+        runs.append((f"async/{size}", APPS["async"], {"TARIF_DB_POOL_SIZE": str(size)}))
+
+    print(f"{'app':<10} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} errors")
+    for name, target, env in runs:
+        command = [sys.executable, "-m", "uvicorn", target, "--port", str(args.port)]
+        command += ["--workers", str(args.workers), "--log-level", "warning"]
+        server = subprocess.Popen(command, cwd=BASE_DIR, env={**os.environ, **env})
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            asyncio.run(wait_until_ready(base_url + "/docs"))
+            url = base_url + args.path
+            for concurrency in CONCURRENCY:
+                latencies, errors = asyncio.run(
+                    run_level(url, concurrency, args.duration)
+                )
+                row = f"{name:<10} {concurrency:>7}"
+                if not latencies:
+                    print(f"{row} {'-':>9} {'-':>8} {'-':>8} {errors}")
+                    continue
+                latencies.sort()
+                p50 = statistics.median(latencies) * 1000
+                p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+                rps = len(latencies) / args.duration
+                print(f"{row} {rps:>9.1f} {p50:>8.1f} {p95:>8.1f} {errors}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
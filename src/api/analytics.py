@@ -0,0 +1,258 @@
+# src/api/analytics.py
+#
+# Columnar mirror of the `salaries` table for ad-hoc aggregates.
+# The data is exported to Parquet once per database version and queried
+# with DuckDB, so analytical scans never run on the SQLite lookup path.
+
+import os
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.api.cache import data_version
+
+# DuckDB is optional; the analytics endpoint reports 503 without it
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+# -------------------------------
+# Config
+# -------------------------------
+BASE_DIR = Path(__file__).resolve().parent.parent.parent  # Project root
+ANALYTICS_DIR = BASE_DIR / "data" / "analytics"
+
+METRICS = {
+    "avg": "AVG",
+    "min": "MIN",
+    "max": "MAX",
+    "sum": "SUM",
+    "count": "COUNT",
+    "median": "MEDIAN",
+}
+# Salary plus the change to the previous valid_from version of the same cell
+VALUES = ("Salary", "raise_abs", "raise_pct")
+DIMENSIONS = ("table_name", "Entgeltgruppe", "Stufe", "valid_from", "region")
+
+# Repeated rows for one cell and valid_from keep only the last imported one,
+# like the salary_history arrays, so they do not add fake 0% raises
+BASE_SQL = """
+WITH latest AS (
+    SELECT *
+    FROM salaries
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY table_name, Entgeltgruppe, Stufe, region, valid_from
+        ORDER BY row_id DESC
+    ) = 1
+),
+base AS (
+    SELECT
+        table_name, Entgeltgruppe, Stufe, valid_from, region, Salary,
+        Salary - LAG(Salary) OVER cell AS raise_abs,
+        (Salary / LAG(Salary) OVER cell - 1) * 100 AS raise_pct
+    FROM latest
+    WINDOW cell AS (
+        PARTITION BY table_name, Entgeltgruppe, Stufe, region
+        ORDER BY valid_from
+    )
+)
+"""
+
+
+class DuckDBMissingError(Exception):
+    """Raised when the analytics endpoint is used without duckdb installed"""
+
+
+class AnalyticsQueryError(Exception):
+    """Raised when DuckDB fails to run an aggregate query"""
+
+
+def _quote(path: Path) -> str:
+    """Escape a path for use inside a single-quoted SQL string"""
+    return path.as_posix().replace("'", "''")
+
+
+def build_aggregate_sql(
+    metric: str = "avg",
+    value: str = "Salary",
+    group_by: Sequence[str] = (),
+    table_name: Optional[str] = None,
+    group: Optional[str] = None,
+    step: Optional[int] = None,
+    region: Optional[str] = None,
+    valid_from_gte: Optional[str] = None,
+    valid_from_lte: Optional[str] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Build a parameterized aggregate query over the salary history.
+
+    Only whitelisted metrics, values and group-by columns are accepted, and
+    filters are passed as parameters. Raises ValueError on anything else.
+    Filters apply after the window, so the first version inside a date range
+    still gets its raise relative to the version before it.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {sorted(METRICS)}")
+    if value not in VALUES:
+        raise ValueError(f"value must be one of {list(VALUES)}")
+    unknown = [column for column in group_by if column not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Cannot group by {unknown}; choose from {list(DIMENSIONS)}")
+    group_by = list(dict.fromkeys(group_by))
+
+    conditions = [f"{value} IS NOT NULL"]
+    params: List[Any] = []
+    for column, operator, param in (
+        ("table_name", "=", table_name),
+        ("Entgeltgruppe", "=", group),
+        ("Stufe", "=", step),
+        ("region", "=", region),
+        ("valid_from", ">=", valid_from_gte),
+        ("valid_from", "<=", valid_from_lte),
+    ):
+        if param is not None:
+            conditions.append(f"{column} {operator} ?")
+            params.append(param)
+
+    select = group_by + [f"{METRICS[metric]}({value}) AS value", "COUNT(*) AS n"]
+    sql = BASE_SQL + f"SELECT {', '.join(select)} FROM base"
+    sql += f" WHERE {' AND '.join(conditions)}"
+    if group_by:
+        sql += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+    return sql, params
+
+
+class _Generation:
+    """One Parquet mirror plus its DuckDB connection and active cursor count"""
+
+    def __init__(self, version, path: Path, con):
+        self.version = version
+        self.path = path
+        self.con = con
+        self.users = 0
+        self.retired = False
+
+    def close(self):
+        self.con.close()
+        if self.path.exists():
+            self.path.unlink()
+
+
+class AnalyticsStore:
+    """
+    Parquet mirror of `salaries` with a DuckDB connection on top.
+
+    The mirror is rebuilt lazily when the SQLite data version changes
+    (regular or atomic imports). Each mirror is a reference-counted
+    generation: queries started on an older one finish on it, and its
+    connection and Parquet file are dropped only once they are done. A store
+    only deletes the Parquet files it wrote itself.
+    """
+
+    def __init__(self, db_path: Path, out_dir: Path = ANALYTICS_DIR):
+        self.db_path = db_path
+        self.out_dir = out_dir
+        self._current: Optional[_Generation] = None
+        self._generations: List[_Generation] = []
+        self._lock = threading.Lock()
+        # Marks the Parquet files of this store; only those are ever deleted
+        self._token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def export_parquet(self, version) -> Path:
+        """
+        Write the current salaries table to a Parquet file for `version`.
+
+        The file name carries a token unique to this store, so several
+        processes (e.g. uvicorn workers) sharing `out_dir` never overwrite
+        each other's mirrors. It is written to a temp file and renamed into
+        place, so a reader never sees a half-written file.
+        """
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        name = "-".join(["salaries", *map(str, version), self._token])
+        path = self.out_dir / f"{name}.parquet"
+        tmp_path = self.out_dir / f"{name}.parquet.tmp"
+
+        conn = sqlite3.connect(self.db_path)
+        df = pd.read_sql(
+            "SELECT rowid AS row_id, table_name, Entgeltgruppe, Stufe, Salary, "
+            "valid_from, region FROM salaries",
+            conn,
+        )
+        conn.close()
+
+        con = duckdb.connect()
+        try:
+            con.register("salaries_df", df)
+            con.execute(
+                f"COPY (SELECT * FROM salaries_df) TO '{_quote(tmp_path)}' "
+                "(FORMAT PARQUET)"
+            )
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+        finally:
+            con.close()
+        os.replace(tmp_path, path)
+        return path
+
+    def _acquire(self) -> _Generation:
+        """Return the generation for the current data version, marked in use."""
+        version = data_version(self.db_path)
+        with self._lock:
+            current = self._current
+            if current is None or current.version != version:
+                path = self.export_parquet(version)
+                con = duckdb.connect()
+                con.execute(
+                    "CREATE VIEW salaries AS SELECT * FROM "
+                    f"read_parquet('{_quote(path)}')"
+                )
+                new = _Generation(version, path, con)
+                self._generations.append(new)
+                if current is not None:
+                    current.retired = True
+                    if current.users == 0:
+                        self._generations.remove(current)
+                        current.close()
+                self._current = current = new
+            current.users += 1
+            return current
+
+    def _release(self, generation: _Generation):
+        with self._lock:
+            generation.users -= 1
+            if generation.retired and generation.users == 0:
+                self._generations.remove(generation)
+                generation.close()
+
+    def aggregate(self, **spec) -> List[Dict[str, Any]]:
+        """
+        Run build_aggregate_sql(**spec) and return the rows as dicts.
+
+        Raises ValueError for an invalid spec, DuckDBMissingError without
+        duckdb and AnalyticsQueryError when DuckDB fails.
+        """
+        if duckdb is None:
+            raise DuckDBMissingError("duckdb is not installed")
+        sql, params = build_aggregate_sql(**spec)
+        generation = self._acquire()
+        try:
+            # Cursors are independent connections to the same database,
+            # safe to use from several threads at once
+            cur = generation.con.cursor()
+            try:
+                cur.execute(sql, params)
+                columns = [column[0] for column in cur.description]
+                return [dict(zip(columns, row)) for row in cur.fetchall()]
+            finally:
+                cur.close()
+        except duckdb.Error as exc:
+            raise AnalyticsQueryError(str(exc)) from exc
+        finally:
+            self._release(generation)
@@ -0,0 +1,304 @@
+# src/api/async_main.py
+#
+# Async variant of src/api/main.py. Endpoints are `async def` and every
+# SQLite call runs on a dedicated executor whose worker threads each hold
+# one pooled connection. Concurrent database work is bounded by the pool
+# size (TARIF_DB_POOL_SIZE, default 64) instead of Starlette's shared
+# threadpool (40). Whether that raises throughput depends on how long
+# queries wait on I/O; for CPU-bound lookups on one core it does not.
+# Measure with scripts/load_test_async.py.
+#
+# Run with: TARIF_DB_POOL_SIZE=128 uvicorn src.api.async_main:app
+
+import asyncio
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import RedirectResponse
+
+from src.api.analytics import AnalyticsQueryError, DuckDBMissingError
+from src.api.cache import data_version
+from src.api.main import (
+    DB_PATH,
+    MAX_BULK_CELLS,
+    GroupMatch,
+    HistoryQuery,
+    SalaryCell,
+    SalaryHistory,
+    analytics_store,
+    build_cells,
+    build_group_index,
+    check_salaries_table,
+    response_cache,
+    select_cell,
+    select_groups,
+    select_histories,
+    select_steps,
+    select_tables,
+)
+
+# -------------------------------
+# Config: database pool
+# -------------------------------
+# Worker threads == pooled connections
+DB_POOL_SIZE = int(os.environ.get("TARIF_DB_POOL_SIZE", "64"))
+
+
+# -------------------------------
+# Database pool
+# -------------------------------
+class DatabasePool:
+    """
+    Bounded executor with one SQLite connection per worker thread.
+
+    Functions passed to `run` receive the worker's connection and execute
+    off the event loop; at most `size` of them run at once.
+    """
+
+    def __init__(self, db_path: Path, size: int = DB_POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def open(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.size, thread_name_prefix="sqlite"
+        )
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return this worker's connection, reopening it after an atomic swap.
+
+        A connection keeps reading the file it opened, so when the database
+        was replaced (new data version) the worker moves to the new
+        generation; requests already running elsewhere finish on the old one.
+        """
+        version = data_version(self.db_path)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.version != version:
+            with self._lock:
+                self._connections.remove(conn)
+            conn.close()
+            conn = None
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.version = version
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def run(self, fn: Callable, *args):
+        """Run `fn(conn, *args)` on the pool and await its result."""
+        if self._executor is None:
+            raise RuntimeError("DatabasePool is not open")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: fn(self._connection(), *args)
+        )
+
+
+# -------------------------------
+# FastAPI app
+# -------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the database pool on startup and close it on shutdown."""
+    pool = DatabasePool(DB_PATH)
+    pool.open()
+    app.state.db = pool
+    app.state.group_index = (None, None)
+    try:
+        yield
+    finally:
+        pool.close()
+
+
+app = FastAPI(title="Tarif Salary API (async)", version="1.0", lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+# -------------------------------
+# Root
+# -------------------------------
+@app.get("/")
+async def root():
+    """Redirect root to docs"""
+    return RedirectResponse(url="/docs")
+
+
+# -------------------------------
+# Endpoints
+# -------------------------------
+@app.get("/v1/tables", response_model=List[str])
+async def get_tables(request: Request):
+    """Return a list of all available table names"""
+    return await request.app.state.db.run(select_tables)
+
+
+@app.get("/v1/cells", response_model=List[SalaryCell])
+async def get_cells(
+    request: Request,
+    table_name: str = Query(..., description="Tarif table, e.g., TV-L, TVöD"),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Return all cells of a table, served pre-encoded from the response cache."""
+    key = (data_version(DB_PATH), "cells", table_name)
+    variants = response_cache.get(key)
+    if variants is None:
+        # JSON encoding and compression happen on the pool, not the event loop
+        variants = await request.app.state.db.run(
+            lambda conn: response_cache.get_or_build(
+                key, lambda: build_cells(conn, table_name)
+            )
+        )
+    return response_cache.render(variants, accept_encoding)
+
+
+@app.get("/v1/lookup", response_model=SalaryCell)
+async def lookup_salary(
+    request: Request,
+    table_name: str = Query(..., description="Tarif table, e.g., TV-L, TVöD"),
+    group: str = Query(..., description="Entgeltgruppe, e.g., E5"),
+    step: int = Query(..., description="Stufe, e.g., 3"),
+):
+    row = await request.app.state.db.run(select_cell, table_name, group, step)
+    if not row:
+        raise HTTPException(status_code=404, detail="Salary cell not found")
+    return row
+
+
+@app.get("/v1/groups", response_model=List[str])
+async def get_groups(
+    request: Request,
+    table_name: str = Query(..., description="Tarif table, e.g., TV-L, TVöD"),
+):
+    """Return all distinct Entgeltgruppen for a given table, sorted naturally."""
+    groups = await request.app.state.db.run(select_groups, table_name)
+    if not groups:
+        raise HTTPException(
+            status_code=404, detail=f"No groups found for table '{table_name}'"
+        )
+    return groups
+
+
+@app.get("/v1/groups/search", response_model=List[GroupMatch])
+async def search_groups(
+    request: Request,
+    q: str = Query(..., description="Entgeltgruppe or prefix, e.g., e13, E 9a"),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """Autocomplete Entgeltgruppen across all tables (prefix, then fuzzy)."""
+    version = data_version(DB_PATH)
+    built_for, index = request.app.state.group_index
+    if built_for != version:
+        index = await request.app.state.db.run(build_group_index)
+        request.app.state.group_index = (version, index)
+    return index.search(q, limit=limit)
+
+
+@app.get("/v1/steps", response_model=List[int])
+async def get_steps(
+    request: Request,
+    table_name: str = Query(..., description="Tarif table, e.g., TV-L, TVöD"),
+    group: str = Query(..., description="Entgeltgruppe, e.g., E5"),
+):
+    """Return all available Stufen for a given table & Entgeltgruppe."""
+    steps = await request.app.state.db.run(select_steps, table_name, group)
+    if not steps:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No steps found for table '{table_name}', group '{group}'",
+        )
+    return steps
+
+
+@app.get("/v1/history", response_model=SalaryHistory)
+async def get_history(
+    request: Request,
+    table_name: str = Query(..., description="Tarif table, e.g., TV-L, TVöD"),
+    group: str = Query(..., description="Entgeltgruppe, e.g., E 13"),
+    step: int = Query(..., description="Stufe, e.g., 3"),
+    region: str = Query("ALL", description="Region, e.g., ALL"),
+):
+    """Return the salary series of one cell across all valid_from versions."""
+    query = HistoryQuery(table_name=table_name, group=group, step=step, region=region)
+    histories = await request.app.state.db.run(select_histories, [query])
+    if not histories:
+        raise HTTPException(status_code=404, detail="Salary cell not found")
+    return histories[0]
+
+
+@app.post("/v1/history/bulk", response_model=List[SalaryHistory])
+async def get_history_bulk(request: Request, queries: List[HistoryQuery]):
+    """Return the salary series of many cells; unknown cells are omitted."""
+    if len(queries) > MAX_BULK_CELLS:
+        raise HTTPException(
+            status_code=422, detail=f"At most {MAX_BULK_CELLS} cells per request"
+        )
+    return await request.app.state.db.run(select_histories, queries)
+
+
+@app.get("/v1/analytics/aggregate", response_model=List[Dict[str, Any]])
+async def get_aggregate(
+    request: Request,
+    metric: str = Query("avg", description="avg, min, max, sum, count, median"),
+    value: str = Query("Salary", description="Salary, raise_abs, raise_pct"),
+    group_by: List[str] = Query(
+        [], description="table_name, Entgeltgruppe, Stufe, valid_from, region"
+    ),
+    table_name: Optional[str] = Query(None, description="Tarif table, e.g., TV-L"),
+    group: Optional[str] = Query(None, description="Entgeltgruppe, e.g., E 13"),
+    step: Optional[int] = Query(None, description="Stufe, e.g., 3"),
+    region: Optional[str] = Query(None, description="Region, e.g., ALL"),
+    valid_from_gte: Optional[str] = Query(None, description="e.g., 2018-01-01"),
+    valid_from_lte: Optional[str] = Query(None, description="e.g., 2025-12-31"),
+):
+    """Aggregate the salary history; runs off the SQLite pool (see main.py)."""
+    await request.app.state.db.run(check_salaries_table)
+    try:
+        return await asyncio.to_thread(
+            analytics_store.aggregate,
+            metric=metric,
+            value=value,
+            group_by=group_by,
+            table_name=table_name,
+            group=group,
+            step=step,
+            region=region,
+            valid_from_gte=valid_from_gte,
+            valid_from_lte=valid_from_lte,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except DuckDBMissingError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except AnalyticsQueryError as exc:
+        raise HTTPException(status_code=500, detail=f"Analytics query failed: {exc}")
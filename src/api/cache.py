@@ -0,0 +1,197 @@
+# src/api/cache.py
+
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Response
+
+# Optional encoders: brotli / zstd are only offered when installed
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# -------------------------------
+# Config
+# -------------------------------
+MIN_COMPRESS_SIZE = 1024  # bytes; smaller bodies are sent as-is
+MAX_CACHE_ENTRIES = 128
+
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+if brotli is not None:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=5)
+if zstandard is not None:
+    ENCODERS["zstd"] = lambda body: zstandard.ZstdCompressor(level=6).compress(body)
+
+# Server preference when the client accepts several encodings equally
+ENCODING_PREFERENCE = ("br", "zstd", "gzip")
+
+
+def data_version(db_path: Path) -> Tuple[int, int, int]:
+    """
+    Return a cheap fingerprint of the database file.
+
+    Changes whenever the file is rewritten or replaced, so it can be used
+    to key caches derived from the data.
+    """
+    try:
+        st = os.stat(db_path)
+    except FileNotFoundError:
+        return (0, 0, 0)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def encode_json(data) -> bytes:
+    """Serialize like FastAPI's JSONResponse does."""
+    return json.dumps(
+        data,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """
+    Pick the best supported content-coding from an Accept-Encoding header.
+
+    Returns "identity" when nothing supported is acceptable.
+    """
+    if not accept_encoding:
+        return "identity"
+
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[token] = q
+
+    wildcard = qualities.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in ENCODERS:
+            continue
+        q = qualities.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class PrecompressedCache:
+    """
+    Bounded LRU cache of encoded response bodies.
+
+    Entries are keyed by (data version, cache key) and hold the raw JSON
+    body plus one variant per supported encoding, compressed once when the
+    entry is stored, so a hot response is served from bytes without
+    re-encoding or re-compressing.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = MAX_CACHE_ENTRIES,
+        min_size: int = MIN_COMPRESS_SIZE,
+    ):
+        self.max_entries = max_entries
+        self.min_size = min_size
+        self._entries: "OrderedDict[Hashable, Dict[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per key being built, so concurrent misses build only once
+        self._building: Dict[Hashable, threading.Lock] = {}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key: Hashable) -> Optional[Dict[str, bytes]]:
+        """Return the cached variants for `key`, or None on a miss."""
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is not None:
+                self._entries.move_to_end(key)
+            return variants
+
+    def put(self, key: Hashable, data) -> Dict[str, bytes]:
+        """Encode `data` as JSON, compress it and store it under `key`."""
+        body = encode_json(data)
+        variants = {"identity": body}
+        if len(body) >= self.min_size:
+            for encoding, encode in ENCODERS.items():
+                variants[encoding] = encode(body)
+        with self._lock:
+            self._entries[key] = variants
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return variants
+
+    def get_or_build(
+        self, key: Hashable, build: Callable[[], object]
+    ) -> Dict[str, bytes]:
+        """
+        Return the variants for `key`, building and storing them on a miss.
+
+        `build` is called at most once per key at a time and must return
+        JSON-serializable data. It may raise HTTPException; errors are not
+        cached. Blocks while another thread builds the same key.
+        """
+        variants = self.get(key)
+        if variants is not None:
+            return variants
+
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            try:
+                variants = self.get(key)
+                if variants is None:
+                    variants = self.put(key, build())
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+        return variants
+
+    def render(
+        self, variants: Dict[str, bytes], accept_encoding: Optional[str]
+    ) -> Response:
+        """Build a Response from cached variants; never compresses."""
+        encoding = "identity"
+        if len(variants) > 1:
+            encoding = negotiate_encoding(accept_encoding)
+        body = variants.get(encoding, variants["identity"])
+
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def respond(
+        self,
+        key: Hashable,
+        accept_encoding: Optional[str],
+        build: Callable[[], object],
+    ) -> Response:
+        """Return a Response for `key`, building and caching it on a miss."""
+        return self.render(self.get_or_build(key, build), accept_encoding)
@@ -1,15 +1,20 @@
 # src/api/main.py
 
+import json
 import re
 import sqlite3
+import threading
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 
+from src.api.analytics import AnalyticsQueryError, AnalyticsStore, DuckDBMissingError
+from src.api.cache import PrecompressedCache, data_version
+from src.utils.group_search import GroupSearchIndex
 from src.utils.sorting import sort_entgeltgruppe_key
 
 # -------------------------------
@@ -21,6 +26,22 @@ DB_PATH = BASE_DIR / "data" / "salaries.db"
 # Ensure data folder exists
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# Shown when a database predates the salary_history table
+HISTORY_HINT = "; run 'python -m src.data_import --rebuild-history'"
+
+# Upper bound for cells in one bulk request
+MAX_BULK_CELLS = 500
+
+# Encoded (and compressed) bodies of cacheable responses
+response_cache = PrecompressedCache()
+
+# Columnar mirror for /v1/analytics, separate from the SQLite lookup path
+analytics_store = AnalyticsStore(DB_PATH)
+
+# Entgeltgruppe search index, rebuilt when the data version changes
+_group_index = (None, None)
+_group_index_lock = threading.Lock()
+
 # -------------------------------
 # FastAPI app
 # -------------------------------
@@ -47,40 +68,179 @@ class SalaryCell(BaseModel):
     region: str
 
 
+class HistoryPoint(BaseModel):
+    valid_from: str
+    Salary: float
+    change_abs: Optional[float] = None
+    change_pct: Optional[float] = None
+
+
+class SalaryHistory(BaseModel):
+    table_name: str
+    Entgeltgruppe: str
+    Stufe: int
+    region: str
+    series: List[HistoryPoint]
+
+
+class GroupMatch(BaseModel):
+    Entgeltgruppe: str
+    tables: List[str]
+
+
+class HistoryQuery(BaseModel):
+    table_name: str
+    group: str
+    step: int
+    region: str = "ALL"
+
+
 # -------------------------------
 # Helper functions
 # -------------------------------
-def check_salaries_table():
-    """Raise HTTPException if the salaries table is missing"""
+# Query helpers take an open connection so the sync endpoints below and the
+# pooled connections of src/api/async_main.py run the same SQL.
+def connect() -> sqlite3.Connection:
+    """Open a connection to the salaries database"""
     conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='salaries';"
-    )
-    if cur.fetchone() is None:
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def run_query(fn: Callable, *args):
+    """Run `fn(conn, *args)` on a fresh connection and close it afterwards"""
+    conn = connect()
+    try:
+        return fn(conn, *args)
+    finally:
         conn.close()
+
+
+def check_table(conn: sqlite3.Connection, name: str, hint: str = ""):
+    """Raise HTTPException if the given table is missing"""
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name=?;", (name,)
+    ).fetchone()
+    if row is None:
         raise HTTPException(
-            status_code=500, detail="Database table 'salaries' not found"
+            status_code=500, detail=f"Database table '{name}' not found{hint}"
         )
-    conn.close()
 
 
-def query_salaries(table_name: str):
+def check_salaries_table(conn: sqlite3.Connection):
+    """Raise HTTPException if the salaries table is missing"""
+    check_table(conn, "salaries")
+
+
+def select_tables(conn: sqlite3.Connection) -> List[str]:
+    """Return all distinct table names"""
+    check_salaries_table(conn)
+    rows = conn.execute("SELECT DISTINCT table_name FROM salaries").fetchall()
+    return [row["table_name"] for row in rows]
+
+
+def query_salaries(conn: sqlite3.Connection, table_name: str):
     """Return all rows for a table_name"""
-    check_salaries_table()
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute(
+    check_salaries_table(conn)
+    rows = conn.execute(
         "SELECT table_name, Entgeltgruppe, Stufe, Salary, valid_from, region "
         "FROM salaries WHERE table_name=?",
         (table_name,),
-    )
-    rows = cur.fetchall()
-    conn.close()
+    ).fetchall()
     return [dict(row) for row in rows]
 
 
+def build_cells(conn: sqlite3.Connection, table_name: str):
+    """Return all rows for a table_name, raising 404 if there are none"""
+    data = query_salaries(conn, table_name)
+    if not data:
+        raise HTTPException(status_code=404, detail=f"No data for table '{table_name}'")
+    return data
+
+
+def select_cell(conn: sqlite3.Connection, table_name: str, group: str, step: int):
+    """Return one salary cell, or None if it does not exist"""
+    check_salaries_table(conn)
+    row = conn.execute(
+        "SELECT table_name, Entgeltgruppe, Stufe, Salary, valid_from, region "
+        "FROM salaries WHERE table_name=? AND Entgeltgruppe=? AND Stufe=?",
+        (table_name, group, step),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def select_groups(conn: sqlite3.Connection, table_name: str) -> List[str]:
+    """Return all distinct Entgeltgruppen of a table, sorted naturally"""
+    check_salaries_table(conn)
+    rows = conn.execute(
+        """
+        SELECT DISTINCT Entgeltgruppe
+        FROM salaries
+        WHERE table_name=?
+        """,
+        (table_name,),
+    ).fetchall()
+    return sorted((row[0] for row in rows), key=sort_entgeltgruppe_key)
+
+
+def select_steps(conn: sqlite3.Connection, table_name: str, group: str) -> List[int]:
+    """Return all Stufen of a table & Entgeltgruppe"""
+    check_salaries_table(conn)
+    rows = conn.execute(
+        """
+        SELECT DISTINCT Stufe
+        FROM salaries
+        WHERE table_name=? AND Entgeltgruppe=?
+        ORDER BY Stufe
+        """,
+        (table_name, group),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def fetch_history(cur: sqlite3.Cursor, query: HistoryQuery):
+    """Return the prebuilt history of one cell, or None if it does not exist"""
+    cur.execute(
+        "SELECT table_name, Entgeltgruppe, Stufe, region, series "
+        "FROM salary_history "
+        "WHERE table_name=? AND Entgeltgruppe=? AND Stufe=? AND region=?",
+        (query.table_name, query.group, query.step, query.region),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    history = dict(row)
+    history["series"] = json.loads(history["series"])
+    return history
+
+
+def select_histories(conn: sqlite3.Connection, queries: List[HistoryQuery]):
+    """Return the histories of the given cells; unknown cells are omitted"""
+    check_table(conn, "salary_history", HISTORY_HINT)
+    cur = conn.cursor()
+    histories = [fetch_history(cur, query) for query in queries]
+    return [history for history in histories if history is not None]
+
+
+def build_group_index(conn: sqlite3.Connection) -> GroupSearchIndex:
+    """Build the Entgeltgruppe search index over all tables"""
+    check_salaries_table(conn)
+    rows = conn.execute(
+        "SELECT DISTINCT table_name, Entgeltgruppe FROM salaries"
+    ).fetchall()
+    return GroupSearchIndex((row[0], row[1]) for row in rows)
+
+
+def get_group_index() -> GroupSearchIndex:
+    """Return the Entgeltgruppe search index for the current data version"""
+    global _group_index
+    version = data_version(DB_PATH)
+    with _group_index_lock:
+        if _group_index[0] != version:
+            _group_index = (version, run_query(build_group_index))
+        return _group_index[1]
+
+
 # -------------------------------
 # Root
 # -------------------------------
@@ -98,24 +258,19 @@ def root():
 @app.get("/v1/tables", response_model=List[str])
 def get_tables():
     """Return a list of all available table names"""
-    check_salaries_table()
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute("SELECT DISTINCT table_name FROM salaries")
-    rows = cur.fetchall()
-    conn.close()
-    return [row["table_name"] for row in rows]
+    return run_query(select_tables)
 
 
 @app.get("/v1/cells", response_model=List[SalaryCell])
 def get_cells(
-    table_name: str = Query(..., description="Tarif table, e.g., TV-L, TVöD")
+    table_name: str = Query(..., description="Tarif table, e.g., TV-L, TVöD"),
+    accept_encoding: Optional[str] = Header(None),
 ):
-    data = query_salaries(table_name)
-    if not data:
-        raise HTTPException(status_code=404, detail=f"No data for table '{table_name}'")
-    return data
+    """Return all cells of a table, served pre-encoded from the response cache."""
+    key = (data_version(DB_PATH), "cells", table_name)
+    return response_cache.respond(
+        key, accept_encoding, lambda: run_query(build_cells, table_name)
+    )
 
 
 @app.get("/v1/lookup", response_model=SalaryCell)
@@ -124,20 +279,10 @@ def lookup_salary(
     group: str = Query(..., description="Entgeltgruppe, e.g., E5"),
     step: int = Query(..., description="Stufe, e.g., 3"),
 ):
-    check_salaries_table()
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT table_name, Entgeltgruppe, Stufe, Salary, valid_from, region "
-        "FROM salaries WHERE table_name=? AND Entgeltgruppe=? AND Stufe=?",
-        (table_name, group, step),
-    )
-    row = cur.fetchone()
-    conn.close()
+    row = run_query(select_cell, table_name, group, step)
     if not row:
         raise HTTPException(status_code=404, detail="Salary cell not found")
-    return dict(row)
+    return row
 
 
 @app.get("/v1/groups", response_model=List[str])
@@ -145,28 +290,21 @@ def get_groups(
     table_name: str = Query(..., description="Tarif table, e.g., TV-L, TVöD")
 ):
     """Return all distinct Entgeltgruppen for a given table, sorted naturally."""
-    check_salaries_table()
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT DISTINCT Entgeltgruppe
-        FROM salaries
-        WHERE table_name=?
-        """,
-        (table_name,),
-    )
-    groups = [row[0] for row in cur.fetchall()]
-    conn.close()
-
+    groups = run_query(select_groups, table_name)
     if not groups:
         raise HTTPException(
             status_code=404, detail=f"No groups found for table '{table_name}'"
         )
+    return groups
 
-    # Sort with custom function
-    groups_sorted = sorted(groups, key=sort_entgeltgruppe_key)
-    return groups_sorted
+
+@app.get("/v1/groups/search", response_model=List[GroupMatch])
+def search_groups(
+    q: str = Query(..., description="Entgeltgruppe or prefix, e.g., e13, E 9a"),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """Autocomplete Entgeltgruppen across all tables (prefix, then fuzzy)."""
+    return get_group_index().search(q, limit=limit)
 
 
 @app.get("/v1/steps", response_model=List[int])
@@ -175,23 +313,74 @@ def get_steps(
     group: str = Query(..., description="Entgeltgruppe, e.g., E5"),
 ):
     """Return all available Stufen for a given table & Entgeltgruppe."""
-    check_salaries_table()
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT DISTINCT Stufe
-        FROM salaries
-        WHERE table_name=? AND Entgeltgruppe=?
-        ORDER BY Stufe
-        """,
-        (table_name, group),
-    )
-    steps = [row[0] for row in cur.fetchall()]
-    conn.close()
+    steps = run_query(select_steps, table_name, group)
     if not steps:
         raise HTTPException(
             status_code=404,
             detail=f"No steps found for table '{table_name}', group '{group}'",
         )
     return steps
+
+
+@app.get("/v1/history", response_model=SalaryHistory)
+def get_history(
+    table_name: str = Query(..., description="Tarif table, e.g., TV-L, TVöD"),
+    group: str = Query(..., description="Entgeltgruppe, e.g., E 13"),
+    step: int = Query(..., description="Stufe, e.g., 3"),
+    region: str = Query("ALL", description="Region, e.g., ALL"),
+):
+    """Return the salary series of one cell across all valid_from versions."""
+    query = HistoryQuery(table_name=table_name, group=group, step=step, region=region)
+    histories = run_query(select_histories, [query])
+    if not histories:
+        raise HTTPException(status_code=404, detail="Salary cell not found")
+    return histories[0]
+
+
+@app.post("/v1/history/bulk", response_model=List[SalaryHistory])
+def get_history_bulk(queries: List[HistoryQuery]):
+    """Return the salary series of many cells; unknown cells are omitted."""
+    if len(queries) > MAX_BULK_CELLS:
+        raise HTTPException(
+            status_code=422, detail=f"At most {MAX_BULK_CELLS} cells per request"
+        )
+    return run_query(select_histories, queries)
+
+
+@app.get("/v1/analytics/aggregate", response_model=List[Dict[str, Any]])
+def get_aggregate(
+    metric: str = Query("avg", description="avg, min, max, sum, count, median"),
+    value: str = Query("Salary", description="Salary, raise_abs, raise_pct"),
+    group_by: List[str] = Query(
+        [], description="table_name, Entgeltgruppe, Stufe, valid_from, region"
+    ),
+    table_name: Optional[str] = Query(None, description="Tarif table, e.g., TV-L"),
+    group: Optional[str] = Query(None, description="Entgeltgruppe, e.g., E 13"),
+    step: Optional[int] = Query(None, description="Stufe, e.g., 3"),
+    region: Optional[str] = Query(None, description="Region, e.g., ALL"),
+    valid_from_gte: Optional[str] = Query(None, description="e.g., 2018-01-01"),
+    valid_from_lte: Optional[str] = Query(None, description="e.g., 2025-12-31"),
+):
+    """
+    Aggregate the salary history, e.g. the average raise per group since 2018:
+    metric=avg&value=raise_pct&group_by=Entgeltgruppe&valid_from_gte=2018-01-01
+    """
+    run_query(check_salaries_table)
+    try:
+        return analytics_store.aggregate(
+            metric=metric,
+            value=value,
+            group_by=group_by,
+            table_name=table_name,
+            group=group,
+            step=step,
+            region=region,
+            valid_from_gte=valid_from_gte,
+            valid_from_lte=valid_from_lte,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except DuckDBMissingError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except AnalyticsQueryError as exc:
+        raise HTTPException(status_code=500, detail=f"Analytics query failed: {exc}")
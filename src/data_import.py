@@ -1,10 +1,17 @@
 # src/data_import.py
 
+import fcntl
+import json
+import os
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterable, List, Tuple
 
 import pandas as pd
 
+from src.utils.cleaning import clean_entgeltgruppe
+
 # -------------------------------
 # Config: database path
 # -------------------------------
@@ -12,11 +19,281 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DB_PATH = BASE_DIR / "data" / "salaries.db"
 
 
-def clean_entgeltgruppe(val: str) -> str:
-    """Clean Entgeltgruppe string: remove non-breaking spaces and trim."""
-    if pd.isna(val):
-        return val
-    return val.replace("\xa0", " ").strip()
+def history_points(rows: Iterable[Tuple[str, float]]) -> List[dict]:
+    """
+    Turn (valid_from, Salary) rows into a salary series with changes.
+
+    Rows must be ordered by valid_from; for repeated dates the last row wins.
+    Each point carries the absolute and percentage change to the previous one.
+    """
+    by_date = {}
+    for valid_from, salary in rows:
+        by_date[valid_from] = float(salary)
+
+    points = []
+    previous = None
+    for valid_from in sorted(by_date):
+        salary = by_date[valid_from]
+        change_abs = None
+        change_pct = None
+        if previous is not None:
+            change_abs = round(salary - previous, 2)
+            if previous:
+                change_pct = round((salary - previous) / previous * 100, 2)
+        points.append(
+            {
+                "valid_from": valid_from,
+                "Salary": salary,
+                "change_abs": change_abs,
+                "change_pct": change_pct,
+            }
+        )
+        previous = salary
+    return points
+
+
+def build_salary_history(conn: sqlite3.Connection, table_name: str):
+    """
+    Rebuild the per-cell history arrays of one table.
+
+    Every (table_name, Entgeltgruppe, Stufe, region) cell gets a single row in
+    `salary_history` holding its whole series as JSON, so the API can serve a
+    time series with one primary-key read. Tables imported before
+    `salary_history` existed (no history rows yet) are backfilled as well.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS salary_history (
+            table_name TEXT NOT NULL,
+            Entgeltgruppe TEXT NOT NULL,
+            Stufe INTEGER NOT NULL,
+            region TEXT NOT NULL,
+            series TEXT NOT NULL,
+            PRIMARY KEY (table_name, Entgeltgruppe, Stufe, region)
+        ) WITHOUT ROWID
+        """
+    )
+    missing = [
+        row[0]
+        for row in cur.execute(
+            """
+            SELECT DISTINCT table_name
+            FROM salaries
+            WHERE table_name NOT IN (SELECT DISTINCT table_name FROM salary_history)
+            """
+        )
+    ]
+    for name in dict.fromkeys([table_name] + missing):
+        _write_table_history(cur, name)
+    conn.commit()
+
+
+def _write_table_history(cur: sqlite3.Cursor, table_name: str):
+    """Replace the salary_history rows of one table"""
+    cur.execute("DELETE FROM salary_history WHERE table_name=?", (table_name,))
+    cur.execute(
+        """
+        SELECT Entgeltgruppe, Stufe, region, valid_from, Salary
+        FROM salaries
+        WHERE table_name=?
+        ORDER BY Entgeltgruppe, Stufe, region, valid_from, rowid
+        """,
+        (table_name,),
+    )
+
+    cells = {}
+    for group, stufe, region, valid_from, salary in cur.fetchall():
+        cells.setdefault((group, stufe, region), []).append((valid_from, salary))
+
+    cur.executemany(
+        "INSERT INTO salary_history "
+        "(table_name, Entgeltgruppe, Stufe, region, series) VALUES (?, ?, ?, ?, ?)",
+        [
+            (table_name, group, stufe, region, json.dumps(history_points(rows)))
+            for (group, stufe, region), rows in cells.items()
+        ],
+    )
+
+
+def rebuild_salary_history(db_path: Path = DB_PATH):
+    """
+    Rebuild the history arrays of every table in an existing database.
+
+    Backfills `salary_history` for databases imported before it existed,
+    without re-importing (and duplicating) any salaries rows.
+    """
+    with write_lock(db_path):
+        conn = sqlite3.connect(db_path)
+        tables = [
+            row[0] for row in conn.execute("SELECT DISTINCT table_name FROM salaries")
+        ]
+        for table_name in tables:
+            build_salary_history(conn, table_name)
+        conn.close()
+
+    print(f"[INFO] Rebuilt salary history for {len(tables)} tables in {db_path}")
+
+
+def create_indexes(conn: sqlite3.Connection):
+    """Create the indexes the API lookups rely on."""
+    cur = conn.cursor()
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_salaries_cell "
+        "ON salaries(table_name, Entgeltgruppe, Stufe)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_salaries_valid_from ON salaries(valid_from)"
+    )
+    conn.commit()
+
+
+def validate_database(
+    conn: sqlite3.Connection,
+    expected_rows: int,
+    table_name: str,
+    valid_from: str,
+    region: str,
+):
+    """
+    Check a freshly built database before it goes live.
+
+    Raises ValueError if the total row count differs from `expected_rows`, or
+    if the imported (table_name, valid_from, region) version has a cell twice
+    or a salary that decreases with Stufe. Other versions are not checked, so
+    duplicates left by earlier append-mode imports do not block new imports.
+    """
+    cur = conn.cursor()
+    version = (table_name, valid_from, region)
+
+    (rows,) = cur.execute("SELECT COUNT(*) FROM salaries").fetchone()
+    if rows != expected_rows:
+        raise ValueError(f"Expected {expected_rows} rows, found {rows}")
+
+    duplicate = cur.execute(
+        """
+        SELECT table_name, Entgeltgruppe, Stufe, valid_from, region
+        FROM salaries
+        WHERE table_name=? AND valid_from=? AND region=?
+        GROUP BY table_name, Entgeltgruppe, Stufe, valid_from, region
+        HAVING COUNT(*) > 1
+        LIMIT 1
+        """,
+        version,
+    ).fetchone()
+    if duplicate is not None:
+        raise ValueError(f"Duplicate salary cell {duplicate}")
+
+    decreasing = cur.execute(
+        """
+        SELECT table_name, Entgeltgruppe, Stufe, valid_from, region
+        FROM (
+            SELECT *, LAG(Salary) OVER (
+                PARTITION BY Entgeltgruppe
+                ORDER BY Stufe
+            ) AS previous_salary
+            FROM salaries
+            WHERE table_name=? AND valid_from=? AND region=?
+        )
+        WHERE Salary < previous_salary
+        LIMIT 1
+        """,
+        version,
+    ).fetchone()
+    if decreasing is not None:
+        raise ValueError(f"Salary decreases with Stufe at {decreasing}")
+
+
+@contextmanager
+def write_lock(db_path: Path = DB_PATH):
+    """
+    Hold an exclusive lock on `<db_path>.lock` for the duration of a write.
+
+    Every writer (plain imports, atomic imports, history rebuilds) takes it,
+    so an atomic import never snapshots a generation that another writer is
+    still changing or about to replace.
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(db_path.with_name(f"{db_path.name}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def swap_in_shadow(
+    df_long: pd.DataFrame,
+    table_name: str,
+    region: str,
+    valid_from: str,
+    db_path: Path = DB_PATH,
+):
+    """
+    Build a new database generation beside `db_path` and rename it into place.
+
+    The live database is copied to a shadow file, rows of the same
+    (table_name, valid_from, region) are replaced by `df_long`, indexes and
+    history are rebuilt and the result is validated. Only then is the shadow
+    renamed over the live file, so readers see either the old or the new
+    generation, never a partial import. The write lock is held from the
+    snapshot through the rename.
+    """
+    shadow_path = db_path.with_name(f"{db_path.name}.shadow-{os.getpid()}")
+
+    with write_lock(db_path):
+        if shadow_path.exists():
+            shadow_path.unlink()
+
+        shadow = None
+        try:
+            shadow = sqlite3.connect(shadow_path)
+            if db_path.exists():
+                live = sqlite3.connect(db_path)
+                live.backup(shadow)  # consistent snapshot, readers are not blocked
+                live.close()
+
+            cur = shadow.cursor()
+            has_salaries = cur.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type='table' AND name='salaries';"
+            ).fetchone()
+            before, deleted = 0, 0
+            if has_salaries:
+                (before,) = cur.execute("SELECT COUNT(*) FROM salaries").fetchone()
+                cur.execute(
+                    "DELETE FROM salaries "
+                    "WHERE table_name=? AND valid_from=? AND region=?",
+                    (table_name, valid_from, region),
+                )
+                deleted = cur.rowcount
+                shadow.commit()
+
+            df_long.to_sql("salaries", shadow, if_exists="append", index=False)
+            create_indexes(shadow)
+            build_salary_history(shadow, table_name)
+            validate_database(
+                shadow,
+                expected_rows=before - deleted + len(df_long),
+                table_name=table_name,
+                valid_from=valid_from,
+                region=region,
+            )
+            shadow.close()
+
+            # Make sure the new generation is on disk before it becomes visible
+            fd = os.open(shadow_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(shadow_path, db_path)
+        except BaseException:
+            if shadow is not None:
+                shadow.close()
+            if shadow_path.exists():
+                shadow_path.unlink()
+            raise
 
 
 def import_csv(
@@ -24,6 +301,7 @@ def import_csv(
     table_name: str,
     region: str = "ALL",
     valid_from: str = "2025-02-01",
+    atomic: bool = False,
 ):
     """
     Read a raw CSV, normalize it, and insert into the unified SQLite salaries table.
@@ -33,6 +311,9 @@ def import_csv(
         table_name: TV-L, TVöD, etc.
         region: Optional region metadata
         valid_from: Effective date of the salary table
+        atomic: Build and validate a shadow database, then swap it in by
+            rename (see swap_in_shadow). Replaces an earlier import of the
+            same table_name / valid_from / region instead of appending.
     """
 
     # -------------------------------
@@ -77,14 +358,19 @@ def import_csv(
     # -------------------------------
     # Step 2: Save to SQLite
     # -------------------------------
-    conn = sqlite3.connect(DB_PATH)
-    df_long.to_sql(
-        "salaries",
-        conn,
-        if_exists="append",  # append new table data
-        index=False,
-    )
-    conn.close()
+    if atomic:
+        swap_in_shadow(df_long, table_name, region, valid_from, db_path=DB_PATH)
+    else:
+        with write_lock(DB_PATH):
+            conn = sqlite3.connect(DB_PATH)
+            df_long.to_sql(
+                "salaries",
+                conn,
+                if_exists="append",  # append new table data
+                index=False,
+            )
+            build_salary_history(conn, table_name)
+            conn.close()
 
     print(
         f"[INFO] Imported {len(df_long)} rows for table '{table_name}' from {csv_path}"
@@ -92,6 +378,12 @@ def import_csv(
 
 
 if __name__ == "__main__":
-    # Example usage
-    import_csv(BASE_DIR / "Entgelttabelle_raw" / "TV-L.csv", table_name="TV-L")
-    import_csv(BASE_DIR / "Entgelttabelle_raw" / "TVoED.csv", table_name="TVöD")
+    import sys
+
+    if sys.argv[1:] == ["--rebuild-history"]:
+        # Backfill salary_history: python -m src.data_import --rebuild-history
+        rebuild_salary_history()
+    else:
+        # Example usage
+        import_csv(BASE_DIR / "Entgelttabelle_raw" / "TV-L.csv", table_name="TV-L")
+        import_csv(BASE_DIR / "Entgelttabelle_raw" / "TVoED.csv", table_name="TVöD")
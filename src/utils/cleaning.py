@@ -0,0 +1,6 @@
+def clean_entgeltgruppe(val: str) -> str:
+    """Clean Entgeltgruppe string: remove non-breaking spaces and trim."""
+    if not isinstance(val, str):
+        # None / NaN from missing CSV cells are passed through unchanged
+        return val
+    return val.replace("\xa0", " ").strip()
@@ -0,0 +1,93 @@
+import bisect
+import difflib
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+from src.utils.cleaning import clean_entgeltgruppe
+from src.utils.sorting import sort_entgeltgruppe_key
+
+
+def normalize_group_key(val: str) -> str:
+    """
+    Normalize an Entgeltgruppe label or search query for matching.
+
+    Examples:
+        "E\\xa013", "e 13", "E13", "13"  -> "e13"
+        "E 2Ü", "e2ue", "E 2 u"          -> "e2u"
+    - Cleans the label with clean_entgeltgruppe
+    - Ignores case and whitespace, folds Ü/ue to u
+    - Adds the "E" prefix to bare numbers
+    """
+    if val is None:
+        return ""
+    val = clean_entgeltgruppe(val).casefold()
+    val = re.sub(r"\s+", "", val)
+    val = val.replace("ü", "u").replace("ue", "u")
+    if val[:1].isdigit():
+        val = "e" + val
+    return val
+
+
+class GroupSearchIndex:
+    """
+    In-memory autocomplete index over Entgeltgruppen of all tables.
+
+    Normalized keys are kept sorted so a prefix lookup is a bisect plus a
+    slice; difflib is only used as a fallback when no prefix matches.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str]]):
+        """Build the index from (table_name, Entgeltgruppe) pairs."""
+        labels: Dict[str, Dict[str, Set[str]]] = {}
+        for table_name, group in rows:
+            if group is None:
+                continue
+            group = clean_entgeltgruppe(group)
+            key = normalize_group_key(group)
+            if key:
+                labels.setdefault(key, {}).setdefault(group, set()).add(table_name)
+
+        self._keys: List[str] = sorted(labels)
+        self._matches: Dict[str, List[dict]] = {
+            key: [
+                {"Entgeltgruppe": group, "tables": sorted(tables)}
+                for group, tables in sorted(
+                    groups.items(), key=lambda item: sort_entgeltgruppe_key(item[0])
+                )
+            ]
+            for key, groups in labels.items()
+        }
+        # Natural order of keys, precomputed so searches never re-sort labels
+        natural = sorted(
+            self._keys,
+            key=lambda k: sort_entgeltgruppe_key(self._matches[k][0]["Entgeltgruppe"]),
+        )
+        self._rank: Dict[str, int] = {key: i for i, key in enumerate(natural)}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Return matching groups, exact match first, then natural order.
+
+        Falls back to fuzzy matching when nothing starts with the query.
+        """
+        q = normalize_group_key(query)
+        if not q:
+            return []
+
+        start = bisect.bisect_left(self._keys, q)
+        end = bisect.bisect_left(self._keys, q + "\uffff", lo=start)
+        keys = self._keys[start:end]
+        if keys:
+            keys.sort(key=lambda k: (k != q, self._rank[k]))
+        else:
+            keys = difflib.get_close_matches(q, self._keys, n=limit, cutoff=0.6)
+
+        results: List[dict] = []
+        for key in keys:
+            results.extend(self._matches[key])
+            if len(results) >= limit:
+                break
+        return results[:limit]
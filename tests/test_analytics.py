@@ -0,0 +1,109 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.api.analytics import AnalyticsStore, build_aggregate_sql
+
+
+def test_build_aggregate_sql_whitelist():
+    sql, params = build_aggregate_sql(
+        metric="avg",
+        value="raise_pct",
+        group_by=["Entgeltgruppe"],
+        valid_from_gte="2018-01-01",
+    )
+    assert "AVG(raise_pct)" in sql
+    assert "GROUP BY Entgeltgruppe" in sql
+    assert params == ["2018-01-01"]
+
+    with pytest.raises(ValueError):
+        build_aggregate_sql(metric="stddev")
+    with pytest.raises(ValueError):
+        build_aggregate_sql(value="Salary; DROP TABLE salaries")
+    with pytest.raises(ValueError):
+        build_aggregate_sql(group_by=["rowid"])
+
+
+def _write_salaries(db_path, salaries, valid_from, stufen=None):
+    conn = sqlite3.connect(db_path)
+    pd.DataFrame(
+        {
+            "table_name": ["TV-L"] * len(salaries),
+            "Entgeltgruppe": ["E 13"] * len(salaries),
+            "Stufe": stufen or [1] * len(salaries),
+            "Salary": salaries,
+            "valid_from": valid_from,
+            "region": ["ALL"] * len(salaries),
+        }
+    ).to_sql("salaries", conn, if_exists="append", index=False)
+    conn.close()
+
+
+def test_analytics_store_average_raise(tmp_path):
+    pytest.importorskip("duckdb")
+    db_path = tmp_path / "salaries.db"
+    _write_salaries(
+        db_path,
+        [4000.0, 4400.0, 5000.0, 5250.0],
+        ["2017-01-01", "2019-01-01"] * 2,
+        stufen=[1, 1, 2, 2],
+    )
+    # A repeated import of the same version must not add a 0% raise
+    _write_salaries(db_path, [4400.0], ["2019-01-01"])
+
+    store = AnalyticsStore(db_path, out_dir=tmp_path / "analytics")
+    rows = store.aggregate(
+        metric="avg",
+        value="raise_pct",
+        group_by=["Entgeltgruppe"],
+        valid_from_gte="2018-01-01",
+    )
+    assert len(rows) == 1
+    assert rows[0]["Entgeltgruppe"] == "E 13"
+    assert rows[0]["value"] == pytest.approx(7.5)
+    assert rows[0]["n"] == 2
+
+
+def test_analytics_store_rebuild_keeps_in_flight_generation(tmp_path):
+    pytest.importorskip("duckdb")
+    db_path = tmp_path / "salaries.db"
+    _write_salaries(db_path, [4000.0], ["2024-01-01"])
+    store = AnalyticsStore(db_path, out_dir=tmp_path / "analytics")
+
+    old = store._acquire()
+    _write_salaries(db_path, [4400.0], ["2025-01-01"])
+    rows = store.aggregate(metric="count", value="Salary")
+    assert rows[0]["value"] == 2
+
+    # The query started before the rebuild still reads its own generation
+    cur = old.con.cursor()
+    assert cur.execute("SELECT COUNT(*) FROM salaries").fetchone() == (1,)
+    cur.close()
+    assert old.path.exists()
+
+    store._release(old)
+    assert not old.path.exists()
+    assert len(list((tmp_path / "analytics").glob("*.parquet"))) == 1
+
+
+def test_analytics_stores_sharing_out_dir_keep_their_files(tmp_path):
+    pytest.importorskip("duckdb")
+    db_path = tmp_path / "salaries.db"
+    out_dir = tmp_path / "analytics"
+    _write_salaries(db_path, [4000.0], ["2024-01-01"])
+    # Two uvicorn workers: separate stores over one directory
+    first = AnalyticsStore(db_path, out_dir=out_dir)
+    second = AnalyticsStore(db_path, out_dir=out_dir)
+
+    in_flight = first._acquire()
+    second.aggregate(metric="count", value="Salary")
+    _write_salaries(db_path, [4400.0], ["2025-01-01"])
+    assert second.aggregate(metric="count", value="Salary")[0]["value"] == 2
+
+    # The other store's rebuild neither deleted nor overwrote this file
+    cur = in_flight.con.cursor()
+    assert cur.execute("SELECT COUNT(*) FROM salaries").fetchone() == (1,)
+    cur.close()
+    first._release(in_flight)
+    assert not list(out_dir.glob("*.tmp"))
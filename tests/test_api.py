@@ -0,0 +1,95 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api.async_main as async_main
+import src.api.main as main
+from src.data_import import build_salary_history
+
+
+@pytest.fixture(params=["sync", "async"])
+def client(request, tmp_path, monkeypatch):
+    db_path = tmp_path / "salaries.db"
+    conn = sqlite3.connect(db_path)
+    pd.DataFrame(
+        {
+            "table_name": ["TV-L"] * 4,
+            "Entgeltgruppe": ["E 13", "E 13", "E 13", "E 9a"],
+            "Stufe": [3, 3, 4, 1],
+            "Salary": [4600.0, 4800.0, 5000.0, 3200.0],
+            "valid_from": ["2024-11-01", "2025-02-01", "2025-02-01", "2025-02-01"],
+            "region": ["ALL"] * 4,
+        }
+    ).to_sql("salaries", conn, index=False)
+    build_salary_history(conn, "TV-L")
+    conn.close()
+
+    monkeypatch.setattr(main, "DB_PATH", db_path)
+    monkeypatch.setattr(async_main, "DB_PATH", db_path)
+    main.response_cache.clear()
+
+    app = main.app if request.param == "sync" else async_main.app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_tables_groups_steps(client):
+    assert client.get("/v1/tables").json() == ["TV-L"]
+    assert client.get("/v1/groups", params={"table_name": "TV-L"}).json() == [
+        "E 9a",
+        "E 13",
+    ]
+    steps = client.get("/v1/steps", params={"table_name": "TV-L", "group": "E 13"})
+    assert steps.json() == [3, 4]
+    assert client.get("/v1/groups", params={"table_name": "TVöD"}).status_code == 404
+
+
+def test_cells_precompressed(client):
+    response = client.get(
+        "/v1/cells",
+        params={"table_name": "TV-L"},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 4
+    assert client.get("/v1/cells", params={"table_name": "TVöD"}).status_code == 404
+
+
+def test_cells_gzip_variant(client, monkeypatch):
+    monkeypatch.setattr(main.response_cache, "min_size", 10)
+    response = client.get(
+        "/v1/cells",
+        params={"table_name": "TV-L"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 4
+
+
+def test_lookup_history_search(client):
+    cell = client.get(
+        "/v1/lookup", params={"table_name": "TV-L", "group": "E 9a", "step": 1}
+    )
+    assert cell.json()["Salary"] == 3200.0
+
+    history = client.get(
+        "/v1/history", params={"table_name": "TV-L", "group": "E 13", "step": 3}
+    ).json()
+    assert [p["valid_from"] for p in history["series"]] == [
+        "2024-11-01",
+        "2025-02-01",
+    ]
+
+    bulk = client.post(
+        "/v1/history/bulk",
+        json=[
+            {"table_name": "TV-L", "group": "E 13", "step": 4},
+            {"table_name": "TV-L", "group": "E 99", "step": 1},
+        ],
+    )
+    assert [h["Stufe"] for h in bulk.json()] == [4]
+
+    matches = client.get("/v1/groups/search", params={"q": "e9"}).json()
+    assert matches == [{"Entgeltgruppe": "E 9a", "tables": ["TV-L"]}]
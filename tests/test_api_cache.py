@@ -0,0 +1,64 @@
+import gzip
+import json
+import threading
+import time
+
+from src.api.cache import PrecompressedCache, negotiate_encoding
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding(None) == "identity"
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") == "identity"
+    assert negotiate_encoding("*") in ("br", "zstd", "gzip")
+
+
+def test_precompressed_cache_builds_once():
+    cache = PrecompressedCache(max_entries=2, min_size=10)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return [{"Entgeltgruppe": "E 13", "Stufe": step} for step in range(1, 7)]
+
+    plain = cache.respond(("v1", "cells", "TV-L"), None, build)
+    zipped = cache.respond(("v1", "cells", "TV-L"), "gzip", build)
+
+    assert len(calls) == 1
+    assert "content-encoding" not in plain.headers
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(zipped.body)) == json.loads(plain.body)
+
+
+def test_precompressed_cache_small_payload_and_eviction():
+    cache = PrecompressedCache(max_entries=1, min_size=1024)
+
+    small = cache.respond("a", "gzip", lambda: ["E 1"])
+    assert "content-encoding" not in small.headers
+
+    cache.respond("b", "gzip", lambda: ["E 2"])
+    rebuilt = []
+    cache.respond("a", "gzip", lambda: rebuilt.append(1) or ["E 1"])
+    assert rebuilt == [1]
+
+
+def test_precompressed_cache_concurrent_misses_build_once():
+    cache = PrecompressedCache(min_size=10)
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return [{"Entgeltgruppe": "E 13", "Stufe": step} for step in range(1, 7)]
+
+    threads = [
+        threading.Thread(target=cache.get_or_build, args=("cells", build))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert "gzip" in cache.get("cells")
@@ -1,10 +1,20 @@
+import json
 import sqlite3
+import threading
 from pathlib import Path
 
 import pandas as pd
 import pytest
 
-from src.data_import import clean_entgeltgruppe, import_csv
+from src.data_import import (
+    build_salary_history,
+    clean_entgeltgruppe,
+    history_points,
+    import_csv,
+    rebuild_salary_history,
+    swap_in_shadow,
+    validate_database,
+)
 
 # Use a temporary SQLite DB for testing
 TEST_DB_PATH = Path("tests/test_salaries.db")
@@ -26,6 +36,190 @@ def test_clean_entgeltgruppe():
     assert clean_entgeltgruppe(None) is None
 
 
+def test_history_points():
+    points = history_points(
+        [("2015-03-01", 4000.0), ("2019-01-01", 4400.0), ("2019-01-01", 4500.0)]
+    )
+    assert [p["valid_from"] for p in points] == ["2015-03-01", "2019-01-01"]
+    assert points[0]["change_abs"] is None
+    assert points[1]["Salary"] == 4500.0
+    assert points[1]["change_abs"] == 500.0
+    assert points[1]["change_pct"] == 12.5
+
+
+def test_build_salary_history():
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame(
+        {
+            "Entgeltgruppe": ["E 13", "E 13", "E 13"],
+            "Stufe": [3, 3, 4],
+            "Salary": [4800.0, 4600.0, 5000.0],
+            "table_name": ["TV-L"] * 3,
+            "region": ["ALL"] * 3,
+            "valid_from": ["2025-02-01", "2024-11-01", "2025-02-01"],
+        }
+    ).to_sql("salaries", conn, index=False)
+
+    build_salary_history(conn, "TV-L")
+
+    rows = conn.execute(
+        "SELECT Stufe, series FROM salary_history ORDER BY Stufe"
+    ).fetchall()
+    conn.close()
+    assert [stufe for stufe, _ in rows] == [3, 4]
+    series = json.loads(rows[0][1])
+    assert [p["valid_from"] for p in series] == ["2024-11-01", "2025-02-01"]
+    assert series[1]["change_abs"] == 200.0
+
+
+def test_build_salary_history_backfills_older_tables():
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame(
+        {
+            "table_name": ["TV-L", "TVöD"],
+            "Entgeltgruppe": ["E 13", "E 13"],
+            "Stufe": [3, 3],
+            "Salary": [4800.0, 4900.0],
+            "valid_from": ["2025-02-01", "2025-04-01"],
+            "region": ["ALL", "ALL"],
+        }
+    ).to_sql("salaries", conn, index=False)
+
+    # Only TVöD is imported after the upgrade; TV-L has no history rows yet
+    build_salary_history(conn, "TVöD")
+
+    tables = conn.execute(
+        "SELECT DISTINCT table_name FROM salary_history ORDER BY 1"
+    ).fetchall()
+    conn.close()
+    assert tables == [("TV-L",), ("TVöD",)]
+
+
+def test_rebuild_salary_history(tmp_path):
+    db_path = tmp_path / "salaries.db"
+    conn = sqlite3.connect(db_path)
+    pd.DataFrame(
+        {
+            "table_name": ["TV-L", "TVöD"],
+            "Entgeltgruppe": ["E 13", "E 13"],
+            "Stufe": [3, 3],
+            "Salary": [4800.0, 4900.0],
+            "valid_from": ["2025-02-01", "2025-04-01"],
+            "region": ["ALL", "ALL"],
+        }
+    ).to_sql("salaries", conn, index=False)
+    conn.close()
+
+    rebuild_salary_history(db_path)
+
+    conn = sqlite3.connect(db_path)
+    tables = conn.execute("SELECT table_name FROM salary_history ORDER BY 1").fetchall()
+    conn.close()
+    assert tables == [("TV-L",), ("TVöD",)]
+
+
+def _salary_frame(salaries, valid_from="2025-02-01"):
+    return pd.DataFrame(
+        {
+            "Entgeltgruppe": ["E 13"] * len(salaries),
+            "Stufe": list(range(1, len(salaries) + 1)),
+            "Salary": salaries,
+            "table_name": ["TV-L"] * len(salaries),
+            "region": ["ALL"] * len(salaries),
+            "valid_from": [valid_from] * len(salaries),
+        }
+    )
+
+
+def test_validate_database():
+    conn = sqlite3.connect(":memory:")
+    version = {"table_name": "TV-L", "valid_from": "2025-02-01", "region": "ALL"}
+    _salary_frame([4000.0, 4200.0]).to_sql("salaries", conn, index=False)
+    validate_database(conn, expected_rows=2, **version)
+    with pytest.raises(ValueError):
+        validate_database(conn, expected_rows=3, **version)
+
+    _salary_frame([4000.0]).to_sql("salaries", conn, if_exists="append", index=False)
+    with pytest.raises(ValueError, match="Duplicate"):
+        validate_database(conn, expected_rows=3, **version)
+
+    # Duplicates in other versions are not the imported version's problem
+    other = {"table_name": "TV-L", "valid_from": "2026-01-01", "region": "ALL"}
+    _salary_frame([4100.0, 4300.0], valid_from="2026-01-01").to_sql(
+        "salaries", conn, if_exists="append", index=False
+    )
+    validate_database(conn, expected_rows=5, **other)
+    conn.close()
+
+
+def test_swap_in_shadow_ignores_duplicates_in_other_tables(tmp_path):
+    db_path = tmp_path / "salaries.db"
+    conn = sqlite3.connect(db_path)
+    # TV-L imported twice in append mode leaves duplicate cells behind
+    for _ in range(2):
+        _salary_frame([4000.0, 4200.0]).to_sql(
+            "salaries", conn, if_exists="append", index=False
+        )
+    conn.close()
+
+    tvoed = _salary_frame([4100.0, 4300.0], valid_from="2025-04-01").assign(
+        table_name="TVöD"
+    )
+    swap_in_shadow(tvoed, "TVöD", "ALL", "2025-04-01", db_path)
+
+    conn = sqlite3.connect(db_path)
+    (rows,) = conn.execute(
+        "SELECT COUNT(*) FROM salaries WHERE table_name='TVöD'"
+    ).fetchone()
+    conn.close()
+    assert rows == 2
+
+
+def test_swap_in_shadow(tmp_path):
+    db_path = tmp_path / "salaries.db"
+    version = ("TV-L", "ALL", "2025-02-01")
+    swap_in_shadow(_salary_frame([4000.0, 4200.0]), *version, db_path)
+    # Re-importing the same version replaces it instead of duplicating rows
+    swap_in_shadow(_salary_frame([4100.0, 4300.0]), *version, db_path)
+
+    conn = sqlite3.connect(db_path)
+    salaries = [row[0] for row in conn.execute("SELECT Salary FROM salaries")]
+    conn.close()
+    assert sorted(salaries) == [4100.0, 4300.0]
+
+    # A failing validation leaves the live database untouched
+    with pytest.raises(ValueError, match="decreases"):
+        swap_in_shadow(
+            _salary_frame([4500.0, 4400.0], valid_from="2026-01-01"),
+            "TV-L",
+            "ALL",
+            "2026-01-01",
+            db_path,
+        )
+    assert not list(tmp_path.glob("*.shadow-*"))
+
+
+def test_swap_in_shadow_concurrent_imports_keep_both(tmp_path):
+    db_path = tmp_path / "salaries.db"
+    threads = [
+        threading.Thread(
+            target=swap_in_shadow,
+            args=(_salary_frame([4000.0, 4200.0], valid_from), "TV-L", "ALL"),
+            kwargs={"valid_from": valid_from, "db_path": db_path},
+        )
+        for valid_from in ("2024-11-01", "2025-02-01", "2026-01-01")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    conn = sqlite3.connect(db_path)
+    (rows,) = conn.execute("SELECT COUNT(*) FROM salaries").fetchone()
+    conn.close()
+    assert rows == 6
+
+
 def test_import_csv(reset_db):
     # Create a minimal CSV for testing
     csv_content = """Entgeltgruppe;1;2
@@ -0,0 +1,42 @@
+from src.utils.group_search import GroupSearchIndex, normalize_group_key
+
+ROWS = [
+    ("TV-L", "E 1"),
+    ("TV-L", "E 2Ü"),
+    ("TV-L", "E 9a"),
+    ("TV-L", "E 10"),
+    ("TV-L", "E 13"),
+    ("TV-L", "E\xa013"),
+    ("TVöD", "E 13"),
+    ("TVöD", "E 9a"),
+]
+
+
+def test_normalize_group_key():
+    assert normalize_group_key("E\xa013") == "e13"
+    assert normalize_group_key(" e 13 ") == "e13"
+    assert normalize_group_key("13") == "e13"
+    assert normalize_group_key("E 2Ü") == normalize_group_key("e2ue") == "e2u"
+    assert normalize_group_key(None) == ""
+
+
+def test_search_exact_across_tables():
+    index = GroupSearchIndex(ROWS)
+    assert index.search("E13") == [
+        {"Entgeltgruppe": "E 13", "tables": ["TV-L", "TVöD"]}
+    ]
+    assert index.search("e 9a")[0]["Entgeltgruppe"] == "E 9a"
+    assert index.search("E2UE")[0]["Entgeltgruppe"] == "E 2Ü"
+
+
+def test_search_prefix_natural_order():
+    index = GroupSearchIndex(ROWS)
+    groups = [match["Entgeltgruppe"] for match in index.search("E 1")]
+    assert groups == ["E 1", "E 10", "E 13"]
+    assert len(index.search("E", limit=2)) == 2
+
+
+def test_search_fuzzy_fallback():
+    index = GroupSearchIndex(ROWS)
+    assert index.search("E 9b")[0]["Entgeltgruppe"] == "E 9a"
+    assert index.search("") == []